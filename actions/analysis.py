@@ -1,5 +1,5 @@
 from src.llm import analyze_competitors
 
 
-def run_llm_analysis(asin: str) -> str:
-    return analyze_competitors(asin)
\ No newline at end of file
+def run_llm_analysis(asin: str, force_refresh: bool = False) -> str:
+    return analyze_competitors(asin, force_refresh=force_refresh)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from src.services import scrape_and_store_product, fetch_and_store_competitors
+from src.services import scrape_and_store_product, fetch_and_store_competitors, prefetch_competitors
 
 
 def scrape_product(asin: str, geo: str, domain: str):
@@ -6,4 +6,8 @@ def scrape_product(asin: str, geo: str, domain: str):
 
 
 def refresh_competitors(asin: str, geo: str, domain: str):
-    return fetch_and_store_competitors(asin, domain, geo)
\ No newline at end of file
+    return fetch_and_store_competitors(asin, domain, geo)
+
+
+def start_competitor_prefetch(asin: str, geo: str, domain: str) -> None:
+    prefetch_competitors(asin, domain, geo)
\ No newline at end of file
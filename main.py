@@ -1,13 +1,49 @@
 import streamlit as st
 
-from src.db import Database
-from actions.scraping import scrape_product, refresh_competitors
+from src.db_cache import get_db
+from actions.scraping import scrape_product, refresh_competitors, start_competitor_prefetch
 from actions.analysis import run_llm_analysis
 from ui.header import render_header
 from ui.inputs import render_inputs
-from ui.product_list import render_product_card
+from ui.product_list import render_product_table
 from ui.competitor_insights import render_competitor_insights
-from state import get_selected_asin
+from state import get_selected_asin, get_fetched_for, set_fetched_for
+
+ITEMS_PER_PAGE = 10
+
+
+@st.fragment
+def _render_product_list(total_products: int) -> None:
+    # A fragment so paging only reruns this block, not the scrape/competitor sections.
+    total_pages = (total_products + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+    page = 1
+    if total_pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+    start_idx = (page - 1) * ITEMS_PER_PAGE
+
+    products = get_db().get_products_page(start_idx, ITEMS_PER_PAGE)
+    # Keyed per page so a row selected on one page isn't reapplied to another.
+    render_product_table(products, key=f"product_table_{start_idx}")
+
+
+@st.fragment
+def _render_competitor_analysis(selected_asin: str, geo: str, domain: str) -> None:
+    # A fragment so refreshing competitors or running the LLM doesn't rerender the product list.
+    refresh_clicked = st.button("Refresh Competitors")
+    if refresh_clicked:
+        with st.spinner("Refreshing competitors..."):
+            refresh_competitors(selected_asin, geo, domain)
+        st.success("Competitors refreshed")
+
+    # ✅ Render ONCE, full width
+    render_competitor_insights(selected_asin)
+
+    analyze_clicked = st.button("Analyze with LLM", type="primary")
+    force_clicked = st.button("Force refresh analysis")
+    if analyze_clicked or force_clicked:
+        with st.spinner("Running LLM analysis..."):
+            analysis = run_llm_analysis(selected_asin, force_refresh=force_clicked)
+        st.markdown(analysis)
 
 
 def main():
@@ -30,15 +66,13 @@ def main():
             st.success("Product scraped successfully")
 
     # --- Product list ---
-    db = Database()
-    products = [p for p in db.get_all_products() if not p.get("parent_asin")]
+    db = get_db()
+    total_products = db.count_products()
 
-    if products:
+    if total_products:
         st.divider()
         st.subheader("Scraped Products")
-
-        for idx, product in enumerate(products):
-            render_product_card(product, idx)
+        _render_product_list(total_products)
 
     # --- Competitor analysis ---
     selected_asin = get_selected_asin()
@@ -46,19 +80,15 @@ def main():
         st.divider()
         st.subheader(f"Competitor analysis for {selected_asin}")
 
-        refresh_clicked = st.button("Refresh Competitors")
-        if refresh_clicked:
-            with st.spinner("Refreshing competitors..."):
-                refresh_competitors(selected_asin, geo, domain)
-            st.success("Competitors refreshed")
-
-        # ✅ Render ONCE, full width
-        render_competitor_insights(selected_asin)
+        # First look at this product: start fetching competitors in the background so
+        # "Refresh Competitors" can use the result instead of waiting on the network.
+        # Only once per selection; after that a button click is required to refetch.
+        if get_fetched_for() != selected_asin:
+            if not db.search_products({"parent_asin": selected_asin}, fields=("asin",)):
+                start_competitor_prefetch(selected_asin, geo, domain)
+            set_fetched_for(selected_asin)
 
-        if st.button("Analyze with LLM", type="primary"):
-            with st.spinner("Running LLM analysis..."):
-                analysis = run_llm_analysis(selected_asin)
-            st.markdown(analysis)
+        _render_competitor_analysis(selected_asin, geo, domain)
 
 
 if __name__ == "__main__":
@@ -3,13 +3,29 @@ import re
 import pandas as pd
 import streamlit as st
 
-from src.db import Database
+from src.db_cache import get_db
+
+_COMP_RE = re.compile(r"(.+?) - USD (\d+\.?\d*)")
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _parse_competitor_rows(competitors: tuple[str, ...]) -> pd.DataFrame:
+    names, prices = [], []
+    for m in map(_COMP_RE.match, competitors):
+        if m:
+            names.append(m.group(1))
+            prices.append(m.group(2))
+    return pd.DataFrame({
+        "Product Name": names,
+        "Price (USD)": pd.to_numeric(prices, errors="coerce").astype("float64"),
+    })
+
 
 st.title("📊 Price Atlas - Competitor Analysis")
 
 # Load products from the TinyDB-backed Database.
 # Note: `data.json` is now a human-readable export; TinyDB storage lives in `tinydb.json`.
-db = Database()
+db = get_db()
 all_products = db.get_all_products()
 
 # Sidebar selecting the product
@@ -35,19 +51,12 @@ if not competitors_list:
     st.stop()
 
 # Parse competitors into DataFrame
-data = []
-for item in competitors_list:
-    match = re.match(r"(.+?) - USD (\d+\.?\d*)", item)
-    if match:
-        name, price = match.groups()
-        data.append({"Product Name": name, "Price (USD)": float(price)})
-
-if not data:
+df = _parse_competitor_rows(tuple(competitors_list))
+
+if df.empty:
     st.info("No valid competitor data to display.")
     st.stop()
 
-df = pd.DataFrame(data)
-
 # Display table
 st.subheader("Competitor Prices Table")
 st.dataframe(df)
\ No newline at end of file
@@ -1,12 +1,90 @@
 from __future__ import annotations
 
+import bisect
 import json
 import os
+import threading
+import time
+import uuid
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
+import orjson
 from tinydb import Query, TinyDB
+from tinydb.middlewares import CachingMiddleware
+from tinydb.storages import JSONStorage
+
+# Unflushed writes that force a flush even inside the debounce window.
+FLUSH_MAX_PENDING = 50
+
+
+def _sort_ts(p: dict) -> float:
+    ts = p.get("scraped_at")
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    created_at = p.get("created_at")
+    if isinstance(created_at, str) and created_at:
+        try:
+            return datetime.fromisoformat(created_at).timestamp()
+        except Exception:
+            return 0.0
+    return 0.0
+
+
+def _loads(raw: bytes) -> Any:
+    # orjson rejects NaN/Infinity and lone surrogate escapes, which the stdlib json
+    # module writes by default; files written that way must still load.
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return json.loads(raw)
+
+
+def _dumps(data: Any, indent: bool = False) -> bytes:
+    # Counterpart of _loads: strings with lone surrogates (loadable via the stdlib
+    # fallback) can't be encoded by orjson, so those go through json as well.
+    try:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+    except orjson.JSONEncodeError:
+        return json.dumps(data, indent=2 if indent else None).encode("utf-8")
+
+
+def _is_base(doc: dict) -> bool:
+    # Target/base rows are those without a (non-empty) parent_asin; competitor
+    # snapshots carry their target's ASIN there.
+    return not doc.get("parent_asin")
+
+
+def _project(docs: list[dict[str, Any]], fields: Iterable[str] | None) -> list[dict[str, Any]]:
+    # Missing keys come back as None, so callers can index the projected rows directly.
+    if fields is None:
+        return docs
+    fields = tuple(fields)
+    return [{f: d.get(f) for f in fields} for d in docs]
+
+
+class _OrjsonStorage(JSONStorage):
+    """JSONStorage that (de)serialises with orjson (stdlib json as fallback). The file is opened in binary mode."""
+
+    def __init__(self, path: str, **kwargs: Any):
+        kwargs.setdefault("access_mode", "rb+")
+        super().__init__(path, **kwargs)
+
+    def read(self) -> dict[str, dict[str, Any]] | None:
+        self._handle.seek(0, os.SEEK_END)
+        if not self._handle.tell():
+            return None
+        self._handle.seek(0)
+        return _loads(self._handle.read())
+
+    def write(self, data: dict[str, dict[str, Any]]) -> None:
+        self._handle.seek(0)
+        self._handle.write(_dumps(data))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.truncate()
 
 
 class Database:
@@ -17,6 +95,15 @@ class Database:
     - The TinyDB storage file must NOT be rewritten as a JSON list.
       (Doing so causes: TypeError: list indices must be integers or slices, not str)
     - If you want a human-readable JSON list, export it to a separate file.
+    - One instance may be shared across Streamlit sessions (see `src.db_cache.get_db`),
+      and TinyDB's JSONStorage is not thread-safe (reads and writes share one file
+      handle), so table access goes through `self._lock`.
+    - `asin` and `parent_asin` are indexed in memory (value -> doc_ids) so lookups
+      don't scan the whole table, and doc_ids are kept ordered by snapshot time for
+      pagination. All writes must go through this class to keep the indexes in sync.
+    - Writes are buffered in memory (TinyDB CachingMiddleware). The storage file and
+      the export file are written at most once per `flush_interval` seconds while
+      writing; call `flush()` after a batch of writes to persist what is pending.
     """
 
     def __init__(
@@ -25,6 +112,7 @@ class Database:
         export_path: str | os.PathLike[str] | None = None,
         migrate_from_path: str | os.PathLike[str] | None = None,
         auto_export: bool = True,
+        flush_interval: float = 5.0,
     ):
         root = Path(__file__).resolve().parents[1]
 
@@ -55,6 +143,15 @@ class Database:
             self.migrate_from_path = root / self.migrate_from_path
 
         self.auto_export = bool(auto_export)
+        self.flush_interval = float(flush_interval)
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._pending = 0
+        self._last_flush = 0.0
+        self._version = 0
+        # Distinguishes this instance's versions from those of an earlier instance
+        # (e.g. after get_db() is cleared), since caches keyed on them outlive it.
+        self._version_token = uuid.uuid4().hex
 
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.export_path.parent.mkdir(parents=True, exist_ok=True)
@@ -75,21 +172,28 @@ class Database:
             # If we copied an existing TinyDB DB into db_path, no further action needed.
             # legacy_products stays empty in that case.
 
-        self.db = TinyDB(str(self.db_path))
+        self.db = TinyDB(str(self.db_path), storage=CachingMiddleware(_OrjsonStorage))
         self.products = self.db.table("products")
 
+        self._by_asin: dict[Any, list[int]] = {}
+        self._by_parent: dict[Any, list[int]] = {}
+        self._indexes = {"asin": self._by_asin, "parent_asin": self._by_parent}
+        # Parallel lists ordered by (_sort_ts, doc_id), oldest first.
+        self._sorted_ts: list[float] = []
+        self._sorted_doc_ids: list[int] = []
+        self._base_doc_ids: set[int] = set()
+        for doc in self.products.all():
+            self._index_doc(doc.doc_id, doc)
+
         if legacy_products:
-            for p in legacy_products:
-                if not isinstance(p, dict):
-                    continue
-                p.setdefault("created_at", datetime.now().isoformat())
-                self.products.insert(p)
-            if self.auto_export:
-                self.export_products()
+            self.insert_products([p for p in legacy_products if isinstance(p, dict)])
+            self.flush()
+
+        self._backfill_scraped_at()
 
     def _maybe_salvage_list_db_file(self, path: Path) -> list[dict[str, Any]]:
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
+            data = _loads(path.read_bytes())
         except Exception:
             # If it's unreadable, back it up and let TinyDB recreate.
             self._backup_file(path, suffix="unreadable")
@@ -117,7 +221,8 @@ class Database:
         Returns (legacy_products_to_import, copied_tinydb_storage).
         """
         try:
-            data = json.loads(src.read_text(encoding="utf-8"))
+            raw = src.read_bytes()
+            data = _loads(raw)
         except Exception:
             return [], False
 
@@ -126,7 +231,7 @@ class Database:
 
         if isinstance(data, dict) and "products" in data and isinstance(data.get("products"), dict):
             # Looks like a TinyDB storage file for the "products" table. Copy it to dst_db.
-            dst_db.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            dst_db.write_bytes(raw)
             return [], True
 
         return [], False
@@ -140,6 +245,71 @@ class Database:
             # Best effort; ignore backup failures.
             pass
 
+    def _backfill_scraped_at(self) -> None:
+        """
+        Give rows without a numeric `scraped_at` one derived from `created_at`.
+
+        Older rows only carry the ISO `created_at`; persisting the timestamp once means
+        sorting snapshots never has to parse ISO strings again.
+        """
+        with self._lock:
+            missing = [
+                (doc.doc_id, ts)
+                for doc in self.products.all()
+                if not isinstance(doc.get("scraped_at"), (int, float)) and (ts := _sort_ts(doc))
+            ]
+            if not missing:
+                return
+            for doc_id, ts in missing:
+                self.products.update({"scraped_at": ts}, doc_ids=[doc_id])
+            self._mark_dirty()
+            self.flush()
+
+    def _index_doc(self, doc_id: int, doc: dict[str, Any]) -> None:
+        ts = _sort_ts(doc)
+        pos = bisect.bisect_right(self._sorted_ts, ts)
+        self._sorted_ts.insert(pos, ts)
+        self._sorted_doc_ids.insert(pos, doc_id)
+        if _is_base(doc):
+            self._base_doc_ids.add(doc_id)
+
+        for field, index in self._indexes.items():
+            if field not in doc:
+                continue
+            try:
+                index.setdefault(doc[field], []).append(doc_id)
+            except TypeError:
+                # Unhashable value; such rows are still found by the scan fallback.
+                pass
+
+    def _unindex_doc(self, doc_id: int, doc: dict[str, Any]) -> None:
+        ts = _sort_ts(doc)
+        pos = bisect.bisect_left(self._sorted_ts, ts)
+        while pos < len(self._sorted_doc_ids) and self._sorted_doc_ids[pos] != doc_id:
+            pos += 1
+        if pos < len(self._sorted_doc_ids):
+            del self._sorted_ts[pos]
+            del self._sorted_doc_ids[pos]
+        self._base_doc_ids.discard(doc_id)
+
+        for field, index in self._indexes.items():
+            if field not in doc:
+                continue
+            try:
+                ids = index.get(doc[field])
+            except TypeError:
+                continue
+            if ids and doc_id in ids:
+                ids.remove(doc_id)
+                if not ids:
+                    del index[doc[field]]
+
+    def _get_docs(self, doc_ids: Iterable[int]) -> list[dict[str, Any]]:
+        doc_ids = list(doc_ids)
+        if not doc_ids:
+            return []
+        return self.products.get(doc_ids=doc_ids)
+
     def export_products(self, export_path: str | os.PathLike[str] | None = None) -> None:
         """
         Export products as a human-readable JSON list.
@@ -154,25 +324,87 @@ class Database:
         if out.resolve() == self.db_path.resolve():
             return
 
-        products = self.products.all()
-        out.write_text(json.dumps(products, indent=4, ensure_ascii=False), encoding="utf-8")
+        with self._lock:
+            products = self.products.all()
+            out.write_bytes(_dumps(products, indent=True))
+
+    def flush(self) -> None:
+        """Write buffered changes to the storage file (and the export) now."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.db.storage.flush()
+            if self.auto_export:
+                self.export_products()
+            self._dirty = False
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush pending writes and close the storage file; the instance is unusable afterwards."""
+        with self._lock:
+            self.flush()
+            self.db.close()
+
+    def version(self) -> tuple[str, int]:
+        """
+        (instance token, write counter); the counter is bumped on every write.
+
+        Use it to key caches of derived data. The token keeps versions unique across
+        Database instances, so a rebuilt instance never matches stale cache entries.
+        """
+        return self._version_token, self._version
+
+    def _mark_dirty(self) -> None:
+        self._version += 1
+        self._dirty = True
+        self._pending += 1
+        if (
+            time.monotonic() - self._last_flush > self.flush_interval
+            or self._pending >= FLUSH_MAX_PENDING
+        ):
+            self.flush()
 
     def insert_product(self, product_data: dict[str, Any]):
         """Insert a new product record into the database."""
         if not isinstance(product_data, dict):
             raise TypeError("insert_product expects a dict")
         product_data.setdefault("created_at", datetime.now().isoformat())
-        inserted_id = self.products.insert(product_data)
-        if self.auto_export:
-            self.export_products()
+        with self._lock:
+            inserted_id = self.products.insert(product_data)
+            self._index_doc(inserted_id, product_data)
+            self._mark_dirty()
         return inserted_id
 
+    def insert_products(self, products_data: list[dict[str, Any]]) -> list[int]:
+        """Insert several product records with a single table write."""
+        if not all(isinstance(p, dict) for p in products_data):
+            raise TypeError("insert_products expects a list of dicts")
+        if not products_data:
+            return []
+        created_at = datetime.now().isoformat()
+        for p in products_data:
+            p.setdefault("created_at", created_at)
+        with self._lock:
+            inserted_ids = self.products.insert_multiple(products_data)
+            for doc_id, p in zip(inserted_ids, products_data):
+                self._index_doc(doc_id, p)
+            self._mark_dirty()
+        return inserted_ids
+
     def update_product(self, asin, update_data):
         """Update an existing product by ASIN."""
-        Product = Query()
-        updated = self.products.update(update_data, Product.asin == asin)
-        if updated and self.auto_export:
-            self.export_products()
+        with self._lock:
+            old_docs = self._get_docs(self._by_asin.get(asin, ()))
+            if not old_docs:
+                return []
+            updated = self.products.update(update_data, doc_ids=[d.doc_id for d in old_docs])
+            for old in old_docs:
+                self._unindex_doc(old.doc_id, old)
+            for new in self._get_docs(updated):
+                self._index_doc(new.doc_id, new)
+            if updated:
+                self._mark_dirty()
         return updated
 
     def get_product(self, asin):
@@ -186,40 +418,104 @@ class Database:
           asks for product X, we want the "base/target" record (no `parent_asin`)
           and we want the *latest* snapshot (by scraped_at / created_at).
         """
-        Product = Query()
-
-        # Prefer "base" records (no parent_asin) when available.
-        base_records = self.products.search(
-            (Product.asin == asin) & (~Product.parent_asin.exists())
-        )
-        candidates = base_records or self.products.search(Product.asin == asin)
+        with self._lock:
+            candidates = self._get_docs(self._by_asin.get(asin, ()))
         if not candidates:
             return None
 
-        def _sort_ts(p: dict) -> float:
-            ts = p.get("scraped_at")
-            if isinstance(ts, (int, float)):
-                return float(ts)
-            created_at = p.get("created_at")
-            if isinstance(created_at, str) and created_at:
-                try:
-                    return datetime.fromisoformat(created_at).timestamp()
-                except Exception:
-                    return 0.0
-            return 0.0
-
-        return max(candidates, key=_sort_ts)
+        # Prefer "base" records (no parent_asin) when available.
+        base_records = [p for p in candidates if _is_base(p)]
+        return max(base_records or candidates, key=_sort_ts)
     
     def get_all_products(self):
         """Get all products in the DB"""
-        return self.products.all()
+        with self._lock:
+            return self.products.all()
+
+    def get_products_page(
+        self,
+        offset: int,
+        limit: int,
+        latest_first: bool = True,
+        base_only: bool = True,
+    ) -> list[dict[str, Any]]:
+        """
+        Return one page of products ordered by snapshot time.
+
+        base_only skips competitor snapshots (rows with `parent_asin`), which is what
+        the product list shows. Only the rows on the page are read from the table.
+        """
+        with self._lock:
+            ordered = reversed(self._sorted_doc_ids) if latest_first else iter(self._sorted_doc_ids)
+            if base_only:
+                ordered = (i for i in ordered if i in self._base_doc_ids)
+            page_ids = list(islice(ordered, max(offset, 0), max(offset, 0) + max(limit, 0)))
+            docs = {d.doc_id: d for d in self._get_docs(page_ids)}
+        return [docs[i] for i in page_ids if i in docs]
+
+    def search_related_products(self, asin: str, fields: Iterable[str] | None = None) -> list[dict[str, Any]]:
+        """
+        Target snapshots of `asin` plus all competitor snapshots stored under it.
+
+        One index lookup per side instead of two search_products calls; callers tell
+        the two apart by `parent_asin`. `fields` works as in search_products.
+        """
+        with self._lock:
+            doc_ids = set(self._by_asin.get(asin, ())) | set(self._by_parent.get(asin, ()))
+            candidates = self._get_docs(doc_ids)
+        return _project(
+            [
+                p for p in candidates
+                if p.get("parent_asin") == asin or (p.get("asin") == asin and _is_base(p))
+            ],
+            fields,
+        )
+
+    def count_products(self, base_only: bool = True) -> int:
+        """Number of products (by default excluding competitor snapshots)."""
+        with self._lock:
+            return len(self._base_doc_ids) if base_only else len(self._sorted_doc_ids)
     
-    def search_products(self, search_criteria):
-        Product = Query()
-        query = None
-        for key, value in search_criteria.items():
-            if query is None:
-                query = (Product[key] == value)
-            else:
-                query &= (Product[key] == value)
-        return self.products.search(query) if query else []
\ No newline at end of file
+    def search_products(self, search_criteria, fields: Iterable[str] | None = None):
+        """
+        Return rows matching every `key == value` pair in search_criteria.
+
+        Indexed keys narrow the candidates first; the remaining keys are checked on
+        those rows only. Without an indexed key this falls back to a table scan.
+
+        fields, if given, projects each row to just those keys (missing ones as None)
+        so callers that only need a few columns don't carry images, descriptions etc.
+        """
+        if not search_criteria:
+            return []
+
+        with self._lock:
+            doc_ids: set[int] | None = None
+            for key, value in search_criteria.items():
+                index = self._indexes.get(key)
+                if index is None:
+                    continue
+                try:
+                    hits = index.get(value, ())
+                except TypeError:
+                    continue
+                doc_ids = set(hits) if doc_ids is None else doc_ids & set(hits)
+
+            if doc_ids is None:
+                Product = Query()
+                query = None
+                for key, value in search_criteria.items():
+                    if query is None:
+                        query = (Product[key] == value)
+                    else:
+                        query &= (Product[key] == value)
+                return _project(self.products.search(query), fields)
+
+            candidates = self._get_docs(doc_ids)
+        return _project(
+            [
+                p for p in candidates
+                if all(key in p and p[key] == value for key, value in search_criteria.items())
+            ],
+            fields,
+        )
\ No newline at end of file
@@ -0,0 +1,32 @@
+import atexit
+
+import streamlit as st
+
+from src.db import Database
+
+# Instance handed out by get_db, so a cache clear can retire it before opening a new one.
+_current: Database | None = None
+
+
+@st.cache_resource
+def get_db() -> Database:
+    """
+    Process-wide Database instance.
+
+    Streamlit reruns the whole script on every interaction; caching the instance keeps
+    TinyDB from re-opening and re-parsing its storage file (and re-running the
+    salvage/migrate checks) on each rerun. The instance is shared across sessions,
+    so Database guards its writes with a lock.
+
+    Pending writes are flushed at interpreter exit. When the cache is cleared, the
+    previous instance is flushed and closed (and its exit hook dropped) first, so it
+    neither lingers with its own copy of the table nor later writes over the file the
+    new instance owns.
+    """
+    global _current
+    if _current is not None:
+        atexit.unregister(_current.flush)
+        _current.close()
+    _current = Database()
+    atexit.register(_current.flush)
+    return _current
@@ -1,53 +1,73 @@
 import os
-from dotenv import load_dotenv
-from src.db import Database
-from typing import List, Optional
-from pydantic import BaseModel, Field
-
-load_dotenv()
-
-
-class CompetitorInsights(BaseModel):
-    asin: str
-    title: Optional[str]
-    price: Optional[float]
-    currency: Optional[str]
-    rating: Optional[float]
-    key_points: List[str] = Field(default_factory=list)
-
-
-class AnalysisOutput(BaseModel):
-    summary: str
-    positioning: str
-    top_competitors: List[CompetitorInsights]
-    recommendations: List[str]
-
-
-def format_competitors(db, parent_asin):
-    comps = db.search_products({"parent_asin": parent_asin})
-    return [
-        {
-            "asin": c["asin"],
-            "title": c["title"],
-            "price": c["price"],
-            "currency": c.get("currency"),
-            "rating": c["rating"],
-            "amazon_domain": c.get("amazon_domain")
-        }
-        for c in comps
-    ]
+from functools import lru_cache
+import streamlit as st
+from src.db_cache import get_db
 
 
-def analyze_competitors(asin):
-    from langchain_groq import ChatGroq
-    from langchain_core.prompts import PromptTemplate
+@lru_cache(maxsize=1)
+def _load_env():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+@lru_cache(maxsize=1)
+def _get_parser():
+    # pydantic and the output models are only needed once an analysis runs, so they
+    # stay out of the app's import path.
+    from typing import List, Optional
+    from pydantic import BaseModel, Field
     from langchain_core.output_parsers import PydanticOutputParser
 
-    db = Database()
-    product = db.get_product(asin)
-    competitors = format_competitors(db, asin)
+    class CompetitorInsights(BaseModel):
+        asin: str
+        title: Optional[str]
+        price: Optional[float]
+        currency: Optional[str]
+        rating: Optional[float]
+        key_points: List[str] = Field(default_factory=list)
+
+    class AnalysisOutput(BaseModel):
+        summary: str
+        positioning: str
+        top_competitors: List[CompetitorInsights]
+        recommendations: List[str]
+
+    return PydanticOutputParser(pydantic_object=AnalysisOutput)
+
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def format_competitors(parent_asin, db_version):
+    # db_version is only part of the cache key: a DB write invalidates the entry.
+    # The projection already yields exactly the keys the prompt uses (None when missing).
+    return get_db().search_products(
+        {"parent_asin": parent_asin},
+        fields=("asin", "title", "price", "currency", "rating", "amazon_domain"),
+    )
+
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def _build_llm_input(asin, db_version):
+    product = get_db().get_product(asin)
+    return {
+        "product_title": product["title"] if product else asin,
+        "brand": product.get("brand") if product else None,
+        "price": product.get("price") if product else None,
+        "currency": product.get("currency") if product else "",
+        "rating": product.get("rating") if product else None,
+        "categories": product.get("categories") if product else None,
+        "amazon_domain": product.get("amazon_domain") if product else "com",
+        "competitors": format_competitors(asin, db_version),
+    }
 
-    parser = PydanticOutputParser(pydantic_object=AnalysisOutput)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _invoke_llm(llm_input):
+    from langchain_groq import ChatGroq
+    from langchain_core.prompts import PromptTemplate
+
+    _load_env()
+    parser = _get_parser()
 
     template = (
         "You are a market analyst. Given a product and its competitor list, "
@@ -92,18 +112,7 @@ def analyze_competitors(asin):
 
     chain = prompt | llm | parser
 
-    result = chain.invoke(
-        {
-            "product_title": product["title"] if product else asin,
-            "brand": product.get("brand") if product else None,
-            "price": product.get("price") if product else None,
-            "currency": product.get("currency") if product else "",
-            "rating": product.get("rating") if product else None,
-            "categories": product.get("categories") if product else None,
-            "amazon_domain": product.get("amazon_domain") if product else "com",
-            "competitors": competitors,
-        }
-    )
+    result = chain.invoke(llm_input)
 
     lines = [
         "Summary:\n" + result.summary,
@@ -123,3 +132,17 @@ def analyze_competitors(asin):
             lines.append(f"- {r}")
 
     return "\n".join(lines)
+
+
+def analyze_competitors(asin, force_refresh=False):
+    """
+    LLM analysis for a product and its competitors.
+
+    The report is cached per LLM input (product + competitors at the current DB
+    version), so repeated clicks don't call the model again until the data changes.
+    force_refresh drops the cached report for this input first.
+    """
+    llm_input = _build_llm_input(asin, get_db().version())
+    if force_refresh:
+        _invoke_llm.clear(llm_input)
+    return _invoke_llm(llm_input)
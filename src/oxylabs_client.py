@@ -1,6 +1,7 @@
 import json 
 import os
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 import streamlit as st
 from dotenv import load_dotenv
@@ -9,6 +10,19 @@ load_dotenv()
 
 OXYLABS_BASE_URL = "https://realtime.oxylabs.io/v1/queries"
 
+# Upper bound on in-flight Oxylabs requests across the whole process: every batch,
+# background prefetch and session shares _request_slots (taken in post_query).
+MAX_CONCURRENT_REQUESTS = 8
+
+SEARCH_STRATEGIES = ["featured", "price_asc", "rating_desc", "avg_rating"]
+
+# One pooled session for all Oxylabs calls, so concurrent requests reuse TLS connections
+# instead of opening a new one per query. The semaphore keeps in-flight requests within
+# the pool size, so urllib3 never has to open (and then discard) overflow connections.
+_session = requests.Session()
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS))
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
 _GEO_ALIASES = {
     # Common user inputs -> best-effort country names
     "us": "United States",
@@ -105,12 +119,13 @@ def post_query(payload):
 
     payload = _compact_payload(payload)
     try:
-        response = requests.post(
-            OXYLABS_BASE_URL,
-            auth=(username, password),
-            json=payload,
-            timeout=60,
-        )
+        with _request_slots:
+            response = _session.post(
+                OXYLABS_BASE_URL,
+                auth=(username, password),
+                json=payload,
+                timeout=60,
+            )
         response.raise_for_status()
     except requests.exceptions.HTTPError as e:
         raise ValueError(_format_http_error(e, payload)) from e
@@ -217,72 +232,105 @@ def normalize_search_result(item):
         "rating": item.get("rating"),
     }
 
-def search_competitors(query_title, domain, categories, pages=1, geo_location=""):
-    st.write("🔎 Searching for competitors")
+def _search_page(search_title, domain, geo_location, category, sort_by, page):
+    payload = {
+        "source": "amazon_search",
+        "query": search_title,
+        "domain": domain,
+        "geo_location": geo_location,
+        "page": page,
+        "sort_by": sort_by,
+        "parse": True
+    }
 
-    domain = normalize_domain(domain)
-    geo_location = normalize_geo_location(geo_location) or ""
-    search_title = clean_product_name(query_title)
-    results = []
-    seen_asins = set()
+    if category:
+        payload["refinements"] = {
+            "category": category
+        }
 
-    strategies = ["featured", "price_asc", "rating_desc", "avg_rating"]
+    content = extract_content(post_query(payload))
+    return [r for r in map(normalize_search_result, extract_search_results(content)) if r]
 
-    for sort_by in strategies:
-        for page in range(1, max(1, pages) + 1):
-            payload = {
-                "source": "amazon_search",
-                "query": search_title,
-                "domain": domain,
-                "geo_location": geo_location,
-                "page": page,
-                "sort_by": sort_by,
-                "parse": True
-            }
 
-            if categories and categories[0]:
-                payload["refinements"] = {
-                    "category": categories[0]
-                }
+def fetch_competitor_search_results(query_title, domain, categories, pages=1, geo_location=""):
+    """
+    Run every (category, sort strategy, page) search concurrently and merge the results.
 
-            content = extract_content(post_query(payload))
-            items = extract_search_results(content)
+    No Streamlit output here, so this is safe to call from a worker thread.
+    Results keep the sequential order (category, then strategy, then page), deduplicated by ASIN.
+    """
+    domain = normalize_domain(domain)
+    geo_location = normalize_geo_location(geo_location) or ""
+    search_title = clean_product_name(query_title)
 
-            for item in items:
-                result = normalize_search_result(item)
-                if result and result["asin"] not in seen_asins:
-                    seen_asins.add(result["asin"])
-                    results.append(result)
+    jobs = [
+        (category, sort_by, page)
+        for category in ([c for c in categories or [] if c] or [None])
+        for sort_by in SEARCH_STRATEGIES
+        for page in range(1, max(1, pages) + 1)
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as pool:
+        pages_results = list(pool.map(
+            lambda job: _search_page(search_title, domain, geo_location, *job),
+            jobs,
+        ))
 
-            time.sleep(0.1)  # Be nice to the API
+    results = []
+    seen_asins = set()
+    for items in pages_results:
+        for result in items:
+            if result["asin"] not in seen_asins:
+                seen_asins.add(result["asin"])
+                results.append(result)
+    return results
 
 
+def search_competitors(query_title, domain, categories, pages=1, geo_location=""):
+    st.write("🔎 Searching for competitors")
+    results = fetch_competitor_search_results(query_title, domain, categories, pages, geo_location)
     st.write(f"✅ Found {len(results)} competitors")
     return results
 
 
+def fetch_product_details(asins, geo_location, domain, on_result=None):
+    """
+    Scrape product details for several ASINs concurrently; failed ASINs are skipped.
+
+    on_result(asin, product_or_None) is called from the calling thread as each request
+    finishes, which lets the UI report progress. Results keep the order of `asins`.
+    """
+    products = {}
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as pool:
+        futures = {pool.submit(scrape_product_details, a, geo_location, domain): a for a in asins}
+        for future in as_completed(futures):
+            a = futures[future]
+            try:
+                products[a] = future.result()
+            except Exception:
+                products[a] = None
+            if on_result:
+                on_result(a, products[a])
+    return [products[a] for a in asins if products.get(a) is not None]
+
+
 def scrap_multiple_products(asins, geo_location, domain):
     st.write("🔎 Scraping details")
-    products = []
 
     progress_text = st.empty()
     progress_bar = st.progress(0)
     total = len(asins)
-
-    for idx, a in enumerate(asins, 1):
-
-        try:
-            progress_text.write(f"Processing competitor {idx} of {total}: {a}")
-            progress_bar.progress(idx / total)
-
-            product = scrape_product_details(a, geo_location, domain)
-            products.append(product)
-            progress_text.write(f"✅ Found: {product.get('title', a)}")
-
-        except Exception as e:
-            progress_text.write(f"❌ Failed to scrape {a}")
-            continue
-        time.sleep(0.1) # Be nice to the API
+    done = 0
+
+    def _report(asin, product):
+        nonlocal done
+        done += 1
+        progress_bar.progress(done / total)
+        if product is None:
+            progress_text.write(f"❌ Failed to scrape {asin} ({done} of {total})")
+        else:
+            progress_text.write(f"✅ Found: {product.get('title', asin)} ({done} of {total})")
+
+    products = fetch_product_details(asins, geo_location, domain, on_result=_report)
 
     progress_text.empty()
     progress_bar.empty()
@@ -1,7 +1,23 @@
+import pandas as pd
 import streamlit as st
-from src.db import Database
-from src.oxylabs_client import scrape_product_details, search_competitors, scrap_multiple_products
+from src.db_cache import get_db
+from src.oxylabs_client import (
+    fetch_competitor_search_results,
+    fetch_product_details,
+    scrape_product_details,
+    search_competitors,
+    scrap_multiple_products,
+)
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Competitor ASINs scraped per refresh (kept small for demo purposes).
+MAX_COMPETITORS = 20
+
+# Runs competitor prefetches started from the product list (see prefetch_competitors).
+# Prefetches older than PREFETCH_MAX_AGE seconds are discarded instead of stored.
+PREFETCH_MAX_AGE = 600
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="competitor-prefetch")
 
 def scrape_and_store_product(asin, geo_location, domain):
     try:
@@ -11,8 +27,9 @@ def scrape_and_store_product(asin, geo_location, domain):
         # Ensure we have a sortable, numeric timestamp for UI ordering.
         # This is intentionally separate from DB-level created_at (which is an ISO string).
         data.setdefault("scraped_at", time.time())
-        db = Database()
+        db = get_db()
         db.insert_product(data)
+        db.flush()
         return data
     except Exception as e:
         # Streamlit-friendly error. The underlying Oxylabs client now includes response
@@ -21,65 +38,138 @@ def scrape_and_store_product(asin, geo_location, domain):
         return None
 
 
+def _search_categories(parent):
+    # dict.fromkeys dedups while keeping first-seen order, so slicing the result is reproducible.
+    raw = (
+        str(cat).strip()
+        for src in (parent.get("categories") or [], parent.get("category_path") or [])
+        for cat in src
+        if cat
+    )
+    return list(dict.fromkeys(cat for cat in raw if cat))
+
+
+def _competitor_asins(search_results, parent_asin):
+    return list(dict.fromkeys(
+        r.get("asin") for r in search_results
+        if r.get("asin") and r.get("asin") != parent_asin and r.get("title")
+    ))
+
+
+def _fetch_competitor_details(
+    parent,
+    parent_asin,
+    domain,
+    geo_location,
+    pages,
+    search=fetch_competitor_search_results,
+    scrape=fetch_product_details,
+):
+    """
+    Network half of a competitor refresh: search by category, then scrape details.
+
+    With the default search/scrape callables there are no Streamlit calls, so it can run
+    in a background thread (see prefetch_competitors); the refresh button passes the UI
+    wrappers (search_competitors / scrap_multiple_products) to show progress instead.
+    Each row is stamped with scraped_at when the scrape finishes, so a prefetch stored
+    later still records when its prices were actually seen.
+    """
+    categories = _search_categories(parent)[:3]
+    if not categories:
+        # Searches are per category; a product without any gets no competitor search.
+        return []
+    all_results = search(
+        query_title=parent["title"],
+        domain=parent.get("amazon_domain", domain),
+        categories=categories,
+        pages=pages,
+        geo_location=parent.get("geo_location", geo_location),
+    )
+    competitor_asins = _competitor_asins(all_results, parent_asin)
+    details = scrape(competitor_asins[:MAX_COMPETITORS], geo_location, domain)
+    scraped_at = time.time()
+    for comp in details:
+        comp.setdefault("scraped_at", scraped_at)
+    return details
+
+
+def prefetch_competitors(parent_asin, domain, geo_location, pages=2):
+    """
+    Start fetching competitor details in the background for this session.
+
+    The pending result is kept in st.session_state and consumed by the next
+    fetch_and_store_competitors call for the same ASIN/domain/geo.
+    """
+    prefetches = st.session_state.setdefault("competitor_prefetch", {})
+    key = (parent_asin, domain, geo_location)
+    if key in prefetches:
+        return
+    parent = get_db().get_product(parent_asin)
+    if not parent:
+        return
+    prefetches[key] = (
+        time.time(),
+        _prefetch_pool.submit(_fetch_competitor_details, parent, parent_asin, domain, geo_location, pages),
+    )
+
+
 def fetch_and_store_competitors(parent_asin, domain, geo_location, pages=2):
-    db = Database()
+    db = get_db()
     parent = db.get_product(parent_asin)
     if not parent:
         return []
-    
-    search_domain = parent.get("amazon_domain", domain)
-    search_geo = parent.get("geo_location", geo_location)
-    st.write(f"🌍 Using domain: {search_domain} | Geo Location: {search_geo}")
-
-    search_categories = []
-    if parent.get("categories"):
-        search_categories.extend(str(cat) for cat in parent["categories"] if cat)
-    if parent.get("category_path"):
-        search_categories.extend(str(cat) for cat in parent["category_path"] if cat)
-
-    search_categories = list(set(
-        cat.strip()
-        for cat in search_categories
-        if cat and isinstance(cat, str ) and cat.strip()
-    ))
 
-    all_results = []
-    for category in search_categories[:3]:
-        search_results = search_competitors(
-            query_title=parent["title"],
-            domain=search_domain,
-            categories=[category],
-            pages=pages,
-            geo_location=search_geo,
-        )
-        all_results.extend(search_results)
-
-    competitor_asins = list(set(
-        r.get("asin") for r in all_results
-        if r.get("asin") and r.get("asin") != parent_asin and r.get("title")
-    ))
+    product_details = None
+    prefetched = None
+    # Take every prefetch for this ASIN out of the session: the one matching the current
+    # domain/geo is used, the others (inputs edited since selection) would never be.
+    prefetches = st.session_state.get("competitor_prefetch", {})
+    for key in [k for k in prefetches if k[0] == parent_asin]:
+        started_at, future = prefetches.pop(key)
+        if key == (parent_asin, domain, geo_location) and time.time() - started_at <= PREFETCH_MAX_AGE:
+            prefetched = future
+        else:
+            future.cancel()
+    if prefetched is not None:
+        try:
+            product_details = prefetched.result()
+            st.write(f"✅ Using {len(product_details)} competitors fetched in the background")
+        except Exception as e:
+            st.write(f"⚠️ Background fetch failed, fetching again: {e}")
 
-    product_details = scrap_multiple_products(competitor_asins[:20], geo_location, domain) # set asin limit to 20 for demo purposes
+    if product_details is None:
+        search_domain = parent.get("amazon_domain", domain)
+        search_geo = parent.get("geo_location", geo_location)
+        st.write(f"🌍 Using domain: {search_domain} | Geo Location: {search_geo}")
+        product_details = _fetch_competitor_details(
+            parent,
+            parent_asin,
+            domain,
+            geo_location,
+            pages,
+            search=search_competitors,
+            scrape=scrap_multiple_products,
+        )
 
-    stored_comps = []
-    for comp in product_details:
+    stored_comps = list(product_details)
+    for comp in stored_comps:
         comp["parent_asin"] = parent_asin
         comp.setdefault("source", "competitor")
-        # Timestamp snapshot so we can build price trends over time.
-        comp.setdefault("scraped_at", time.time())
-        db.insert_product(comp)
-        stored_comps.append(comp)
+    db.insert_products(stored_comps)
+    db.flush()
 
+    # One dataframe element instead of one st.write per competitor.
     st.write("📈 Competitor Summary")
-    for comp in stored_comps:
-        price = comp.get("price", "-")
-        currency = comp.get("currency", "-")
-        if isinstance(price, (int, float)):
-            price_str = f"{currency} {price:,.2f}" if currency else f"{price:,.2f}"
-        else:
-            price_str = str(price)
-
-        st.write(f"- {comp.get('title')} - {price_str}")
+    st.dataframe(
+        pd.DataFrame(
+            [
+                {"title": c.get("title"), "price": c.get("price"), "currency": c.get("currency")}
+                for c in stored_comps
+            ],
+            columns=["title", "price", "currency"],
+        ),
+        hide_index=True,
+    )
     st.write("---")
 
     return stored_comps
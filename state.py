@@ -6,4 +6,12 @@ def set_selected_asin(asin: str) -> None:
 
 
 def get_selected_asin() -> str | None:
-    return st.session_state.get("analyzing_asin")
\ No newline at end of file
+    return st.session_state.get("analyzing_asin")
+
+
+def set_fetched_for(asin: str) -> None:
+    st.session_state["fetched_for"] = asin
+
+
+def get_fetched_for() -> str | None:
+    return st.session_state.get("fetched_for")
@@ -1,31 +1,16 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
+from plotly.colors import qualitative
 
-from src.db import Database
+from src.db_cache import get_db
 
-# Utility function to parse dates
 from datetime import datetime
+from operator import itemgetter
 from typing import Any
 
 
-def _parse_created_at_iso(created_at: str) -> float:
-    try:
-        return datetime.fromisoformat(created_at).timestamp()
-    except Exception:
-        return 0.0
-
-
-def _product_sort_ts(p: dict) -> float:
-    ts = p.get("scraped_at")
-    if isinstance(ts, (int, float)):
-        return float(ts)
-    created_at = p.get("created_at")
-    if isinstance(created_at, str) and created_at:
-        return _parse_created_at_iso(created_at)
-    return 0.0
-
-
 def _safe_price(x: Any) -> float | None:
     try:
         v = float(x)
@@ -36,79 +21,222 @@ def _safe_price(x: Any) -> float | None:
     return v
 
 
-def _to_dt_from_record(p: dict) -> datetime | None:
-    ts = p.get("scraped_at")
-    if isinstance(ts, (int, float)):
-        try:
-            return datetime.fromtimestamp(float(ts))
-        except Exception:
-            pass
-    created_at = p.get("created_at")
-    if isinstance(created_at, str) and created_at:
+_RECORD_COLUMNS = [
+    "asin",
+    "title",
+    "brand",
+    "price",
+    "currency",
+    "rating",
+    "amazon_domain",
+    "geo_location",
+    "parent_asin",
+    "created_at",
+    "scraped_at",
+]
+
+_get_record_columns = itemgetter(*_RECORD_COLUMNS)
+
+_CATEGORY_COLUMNS = ("brand", "currency", "amazon_domain", "geo_location")
+
+
+def _record_row(record: dict) -> tuple:
+    # Fast path for rows already projected to _RECORD_COLUMNS (fields= on the DB query);
+    # raw rows missing some keys get None there, as DataFrame.from_records would.
+    try:
+        return _get_record_columns(record)
+    except KeyError:
+        return tuple(map(record.get, _RECORD_COLUMNS))
+
+
+_PALETTE = qualitative.Plotly
+
+
+def _traces_by(df: pd.DataFrame, key: str, make) -> list:
+    """One trace per value of `key` (each gets a legend entry), colored from the palette."""
+    return [
+        make(g, str(name), _PALETTE[i % len(_PALETTE)])
+        for i, (name, g) in enumerate(df.groupby(key, sort=False, observed=True))
+    ]
+
+
+def _blank(s: pd.Series) -> pd.Series:
+    return s.isna() | (s == "")
+
+
+def _local_time_lookup(epochs: pd.Series) -> dict[float, datetime | None]:
+    # datetime.fromtimestamp semantics (naive local time, DST-aware) without a tz
+    # database dependency; evaluated once per distinct epoch, and a refresh batch
+    # shares one scraped_at.
+    lookup = {}
+    for ts in epochs.dropna().unique():
         try:
-            return datetime.fromisoformat(created_at)
-        except Exception:
-            return None
-    return None
+            lookup[ts] = datetime.fromtimestamp(ts)
+        except (OverflowError, OSError, ValueError):
+            lookup[ts] = None
+    return lookup
 
 
 def _records_to_df(records: list[dict]) -> pd.DataFrame:
-    rows = []
-    for r in records or []:
-        dt = _to_dt_from_record(r)
-        rows.append(
-            {
-                "asin": r.get("asin"),
-                "title": r.get("title") or r.get("asin"),
-                "brand": r.get("brand") or "Unknown",
-                "price": _safe_price(r.get("price")),
-                "currency": r.get("currency") or "",
-                "rating": r.get("rating"),
-                "amazon_domain": r.get("amazon_domain") or "",
-                "geo_location": (r.get("geo_location") or "").strip() or "Unknown",
-                "parent_asin": r.get("parent_asin"),
-                "source": r.get("source") or ("competitor" if r.get("parent_asin") else "target"),
-                "created_at": r.get("created_at"),
-                "scraped_at": r.get("scraped_at"),
-                "dt": dt,
-            }
-        )
-    df = pd.DataFrame(rows)
-    if not df.empty:
-        df["dt"] = pd.to_datetime(df["dt"], errors="coerce")
+    # One itemgetter call per row, transposed into columns with zip.
+    if records:
+        df = pd.DataFrame(dict(zip(_RECORD_COLUMNS, zip(*map(_record_row, records)))))
+    else:
+        df = pd.DataFrame(columns=_RECORD_COLUMNS)
+
+    # Column-wise cleanup on the whole frame instead of a Python loop per record.
+
+    df["title"] = df["title"].mask(_blank(df["title"]), df["asin"])
+    df["brand"] = df["brand"].mask(_blank(df["brand"]), "Unknown")
+    price = pd.to_numeric(df["price"], errors="coerce").astype("float64")
+    df["price"] = price.mask(price <= 0)
+    df["currency"] = df["currency"].mask(_blank(df["currency"]), "")
+    df["amazon_domain"] = df["amazon_domain"].mask(_blank(df["amazon_domain"]), "")
+    df["geo_location"] = df["geo_location"].fillna("").astype(str).str.strip().replace("", "Unknown")
+
+    # Snapshot time: numeric scraped_at (epoch, shown in local time), else ISO created_at.
+    scraped_at = pd.to_numeric(df["scraped_at"], errors="coerce")
+    dt_scraped = pd.to_datetime(scraped_at.map(_local_time_lookup(scraped_at)), errors="coerce")
+    # The DB backfills scraped_at, so only the few rows without it need the ISO parse.
+    # cache=True reuses the parse for snapshots that share a timestamp string.
+    missing = dt_scraped.isna()
+    if missing.any():
+        dt_created = pd.to_datetime(df["created_at"][missing], format="ISO8601", errors="coerce", cache=True)
+        dt_scraped = dt_scraped.fillna(dt_created)
+    df["dt"] = dt_scraped
+
+    # Low-cardinality labels used as group/color keys: integer codes instead of strings.
+    # Group on these with observed=True so unused categories don't show up as empty groups.
+    for col in _CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
     return df
 
 
 def _latest_by_asin(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
-    df2 = df.copy()
-    if "dt" not in df2.columns:
-        df2["dt"] = pd.NaT
-    df2 = df2.sort_values(["asin", "dt"], ascending=[True, True], na_position="first")
-    latest = df2.groupby("asin", as_index=False).tail(1)
-    return latest
+    # Per-ASIN argmax of the snapshot time, no full-frame sort. Missing times count as
+    # oldest so an ASIN whose snapshots all lack a time still keeps one row.
+    dt = df["dt"].fillna(pd.Timestamp.min)
+    idx = dt.groupby(df["asin"]).idxmax()
+    return df.loc[idx].reset_index(drop=True)
+
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _load_competitor_frame(
+    selected_asin: str, db_version: tuple[str, int]
+) -> tuple[dict, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Target record, all/latest competitor snapshots and the target's own history.
+
+    Competitors and target history come from one DB lookup and one frame build,
+    split on parent_asin. db_version keys the cache, so a DB write (e.g. a
+    competitor refresh) makes the next render load fresh frames.
+    """
+    db = get_db()
+    parent = db.get_product(selected_asin) or {}
+    df = _records_to_df(db.search_related_products(selected_asin, fields=_RECORD_COLUMNS))
+    is_competitor = (df["parent_asin"] == selected_asin).to_numpy()
+    df_all = df[is_competitor].reset_index(drop=True)
+    df_target = df[~is_competitor].reset_index(drop=True)
+    return dict(parent), df_all, _latest_by_asin(df_all), df_target
+
+
+def _classify_prices(prices: np.ndarray, parent_price: float, threshold_pct: float) -> np.ndarray:
+    """
+    Bucket code per price: 0 missing, 1 deal, 2 cheaper, 3 within ±5%, 4 more expensive.
+
+    Later assignments overwrite earlier ones, so the most specific bucket wins (the
+    same precedence as checking missing → deal → cheaper → within ±5% in order).
+    """
+    codes = np.full(prices.shape, 4, dtype=np.int8)
+    codes[np.abs(prices - parent_price) / parent_price <= 0.05] = 3
+    codes[prices < parent_price] = 2
+    codes[prices < parent_price * (1 - threshold_pct / 100.0)] = 1
+    codes[np.isnan(prices)] = 0
+    return codes
+
+
+@st.fragment
+def _render_overview(df_latest: pd.DataFrame, parent_price: float | None, selected_asin: str):
+    # A fragment so moving the deal threshold slider only reruns this tab,
+    # not the DB load and the figures of the other three tabs.
+    if df_latest.empty:
+        st.info("No competitor data available.")
+        return
+
+    # Deal threshold slider
+    threshold_pct = st.slider(
+        "Deal alert threshold (% cheaper than target)",
+        min_value=1,
+        max_value=50,
+        value=10,
+        step=1,
+        key=f"deal_threshold_{selected_asin}"
+    )
+
+    if parent_price is None:
+        bucket = np.where(df_latest["price"].notna(), "Has price", "Missing price")
+    else:
+        codes = _classify_prices(df_latest["price"].to_numpy(), parent_price, threshold_pct)
+        labels = ["Missing price", f"Deal (≥{threshold_pct}% cheaper)", "Cheaper", "Within ±5%", "More expensive"]
+        bucket = pd.Categorical.from_codes(codes, categories=labels)
+
+    pie = pd.Series(bucket).value_counts()
+    pie = pie[pie > 0]
+    fig_pie = go.Figure(
+        go.Pie(labels=pie.index.to_numpy(), values=pie.to_numpy()),
+        layout=go.Layout(title="Top Competitors Overview (price buckets)"),
+    )
+    st.plotly_chart(fig_pie, width="stretch")
+
+    # value_counts on a categorical also lists unused categories, with a zero count.
+    brand_counts = df_latest["brand"].value_counts()
+    brand_counts = brand_counts[brand_counts > 0].head(10)
+    fig_brand = go.Figure(
+        go.Bar(x=brand_counts.index.to_numpy(), y=brand_counts.to_numpy()),
+        layout=go.Layout(title="Top Brands in Competitor Set (listing count)", xaxis_title="brand", yaxis_title="size"),
+    )
+    st.plotly_chart(fig_brand, width="stretch")
+
+    if parent_price is not None and df_latest["price"].notna().any():
+        # Same latest-snapshot frame and same codes as the pie, so the table always
+        # lists exactly the competitors in its "Deal" slice.
+        deals = (
+            df_latest[codes == 1]
+            .assign(
+                delta=lambda d: d["price"] - parent_price,
+                delta_pct=lambda d: (d["price"] / parent_price - 1.0) * 100.0,
+            )
+            .sort_values("delta")
+        )
+
+        st.subheader("Deal Detection / Alerts")
+        if deals.empty:
+            st.info("No competitors meet the current deal threshold.")
+        else:
+            st.success(f"Found {len(deals)} deal(s) at ≥{threshold_pct}% cheaper than the target.")
+            st.dataframe(
+                deals[["title", "asin", "brand", "price", "currency", "delta", "delta_pct", "amazon_domain", "geo_location"]],
+                width="stretch",
+            )
 
 
 def render_competitor_insights(selected_asin: str):
     """
     Full-featured competitor insights UI.
     """
-    db = Database()
-    parent = db.get_product(selected_asin) or {}
+    db_version = get_db().version()
+    parent, df_all, df_latest, base_hist = _load_competitor_frame(selected_asin, db_version)
     parent_price = _safe_price(parent.get("price"))
     parent_currency = parent.get("currency") or ""
     parent_title = parent.get("title") or selected_asin
 
-    comp_records = db.search_products({"parent_asin": selected_asin})
-    if not comp_records:
+    if df_all.empty:
         st.info("No competitor records yet. Click “Refresh Competitors” to populate data.")
         return
 
-    df_all = _records_to_df(comp_records)
-    df_latest = _latest_by_asin(df_all)
-
-    df_priced = df_latest.dropna(subset=["price"]).copy()
+    df_priced = df_latest.dropna(subset=["price"])
 
     st.caption(f"Target: {parent_title} | Price: {parent_currency} {parent_price if parent_price is not None else 'N/A'}")
 
@@ -134,14 +262,29 @@ def render_competitor_insights(selected_asin: str):
 
         if not df_priced.empty:
             df_bar = df_priced.sort_values("price", ascending=True)
-            fig_bar = px.bar(
-                df_bar,
-                x="price",
-                y="title",
-                orientation="h",
-                color="brand",
-                hover_data=["asin", "amazon_domain", "geo_location", "rating"],
-                title="Price Comparison Across Competitors (latest snapshot)",
+            fig_bar = go.Figure(
+                _traces_by(df_bar, "brand", lambda g, name, color: go.Bar(
+                    x=g["price"].to_numpy(),
+                    y=g["title"].to_numpy(),
+                    orientation="h",
+                    name=name,
+                    marker_color=color,
+                    customdata=g[["asin", "amazon_domain", "geo_location", "rating"]].to_numpy(),
+                    hovertemplate=(
+                        "%{y}<br>price=%{x}<br>asin=%{customdata[0]}<br>amazon_domain=%{customdata[1]}"
+                        "<br>geo_location=%{customdata[2]}<br>rating=%{customdata[3]}"
+                    ),
+                )),
+                layout=go.Layout(
+                    title="Price Comparison Across Competitors (latest snapshot)",
+                    barmode="relative",
+                    xaxis_title="price",
+                    yaxis_title="title",
+                    # Keep the price order across brand traces (cheapest at the bottom).
+                    yaxis_categoryorder="array",
+                    yaxis_categoryarray=df_bar["title"].to_numpy(),
+                    legend_title_text="brand",
+                ),
             )
             if parent_price is not None:
                 fig_bar.add_vline(
@@ -151,15 +294,27 @@ def render_competitor_insights(selected_asin: str):
                     annotation_text="Target price",
                     annotation_position="top",
                 )
-            st.plotly_chart(fig_bar, use_container_width=True)
-
-            fig_scatter = px.scatter(
-                df_priced,
-                x="rating",
-                y="price",
-                color="brand",
-                hover_data=["title", "asin", "amazon_domain", "geo_location"],
-                title="Price vs Rating (latest snapshot)",
+            st.plotly_chart(fig_bar, width="stretch")
+
+            fig_scatter = go.Figure(
+                _traces_by(df_priced, "brand", lambda g, name, color: go.Scatter(
+                    x=g["rating"].to_numpy(),
+                    y=g["price"].to_numpy(),
+                    mode="markers",
+                    name=name,
+                    marker_color=color,
+                    customdata=g[["title", "asin", "amazon_domain", "geo_location"]].to_numpy(),
+                    hovertemplate=(
+                        "%{customdata[0]}<br>rating=%{x}<br>price=%{y}<br>asin=%{customdata[1]}"
+                        "<br>amazon_domain=%{customdata[2]}<br>geo_location=%{customdata[3]}"
+                    ),
+                )),
+                layout=go.Layout(
+                    title="Price vs Rating (latest snapshot)",
+                    xaxis_title="rating",
+                    yaxis_title="price",
+                    legend_title_text="brand",
+                ),
             )
             if parent_price is not None:
                 fig_scatter.add_hline(
@@ -169,30 +324,27 @@ def render_competitor_insights(selected_asin: str):
                     annotation_text="Target price",
                     annotation_position="top left",
                 )
-            st.plotly_chart(fig_scatter, use_container_width=True)
+            st.plotly_chart(fig_scatter, width="stretch")
 
             # Tabular view with deltas
-            df_table = df_priced[["title", "asin", "brand", "price", "currency", "rating", "amazon_domain", "geo_location"]].copy()
+            df_table = df_priced[["title", "asin", "brand", "price", "currency", "rating", "amazon_domain", "geo_location"]]
             if parent_price is not None:
-                df_table["delta"] = df_table["price"] - parent_price
-                df_table["delta_pct"] = (df_table["price"] / parent_price - 1.0) * 100.0
-                df_table = df_table.sort_values("delta")
-            st.dataframe(df_table, use_container_width=True)
+                df_table = df_table.assign(
+                    delta=df_table["price"] - parent_price,
+                    delta_pct=(df_table["price"] / parent_price - 1.0) * 100.0,
+                ).sort_values("delta")
+            st.dataframe(df_table, width="stretch")
 
     # ------------------ Trends Tab ------------------
     with tab_trends:
         st.caption("Trend charts appear once you scrape multiple times (snapshots).")
-        df_hist = df_all.dropna(subset=["asin", "dt"]).copy()
-        df_hist["price"] = pd.to_numeric(df_hist["price"], errors="coerce")
-        df_hist = df_hist.dropna(subset=["price"])
-        base_hist = _records_to_df(
-            [r for r in db.search_products({"asin": selected_asin}) if not r.get("parent_asin")]
-        )
+        # price and dt are already float64 / datetime64 from _records_to_df.
+        df_hist = df_all.dropna(subset=["asin", "dt", "price"])
         if not base_hist.empty:
-            base_hist = base_hist.dropna(subset=["dt"])
-            base_hist["price"] = pd.to_numeric(base_hist["price"], errors="coerce")
-            base_hist["asin"] = f"{selected_asin} (target)"
-            base_hist["title"] = parent_title
+            base_hist = base_hist.dropna(subset=["dt"]).assign(
+                asin=f"{selected_asin} (target)",
+                title=parent_title,
+            )
             df_hist2 = pd.concat([df_hist, base_hist], ignore_index=True)
         else:
             df_hist2 = df_hist
@@ -203,17 +355,28 @@ def render_competitor_insights(selected_asin: str):
             series = sorted(df_hist2["asin"].dropna().unique().tolist())
             default_series = series[: min(6, len(series))]
             chosen = st.multiselect("Series to plot", options=series, default=default_series, key=f"trend_select_{selected_asin}")
-            df_plot = df_hist2[df_hist2["asin"].isin(chosen)].copy()
-            fig_line = px.line(
-                df_plot.sort_values("dt"),
-                x="dt",
-                y="price",
-                color="asin",
-                markers=True,
-                hover_data=["title", "amazon_domain", "geo_location"],
-                title="Price Trends Over Time (snapshots)",
+            df_plot = df_hist2[df_hist2["asin"].isin(chosen)]
+            fig_line = go.Figure(
+                _traces_by(df_plot.sort_values("dt"), "asin", lambda g, name, color: go.Scatter(
+                    x=g["dt"].to_numpy(),
+                    y=g["price"].to_numpy(),
+                    mode="lines+markers",
+                    name=name,
+                    line_color=color,
+                    customdata=g[["title", "amazon_domain", "geo_location"]].to_numpy(),
+                    hovertemplate=(
+                        "%{customdata[0]}<br>dt=%{x}<br>price=%{y}"
+                        "<br>amazon_domain=%{customdata[1]}<br>geo_location=%{customdata[2]}"
+                    ),
+                )),
+                layout=go.Layout(
+                    title="Price Trends Over Time (snapshots)",
+                    xaxis_title="dt",
+                    yaxis_title="price",
+                    legend_title_text="asin",
+                ),
             )
-            st.plotly_chart(fig_line, use_container_width=True)
+            st.plotly_chart(fig_line, width="stretch")
 
     # ------------------ Regions Tab ------------------
     with tab_regions:
@@ -222,97 +385,55 @@ def render_competitor_insights(selected_asin: str):
         else:
             # Domain-level distribution
             by_domain = (
-                df_priced.groupby("amazon_domain", as_index=False)["price"]
+                df_priced.groupby("amazon_domain", as_index=False, sort=False, observed=True)["price"]
                 .agg(avg_price="mean", min_price="min", max_price="max", count="count")
                 .sort_values("avg_price")
             )
-            fig_domain = px.bar(
-                by_domain,
-                x="amazon_domain",
-                y="avg_price",
-                hover_data=["count", "min_price", "max_price"],
-                title="Country/Domain-wise Price Distribution (avg price by amazon domain)",
+            fig_domain = go.Figure(
+                go.Bar(
+                    x=by_domain["amazon_domain"].to_numpy(),
+                    y=by_domain["avg_price"].to_numpy(),
+                    customdata=by_domain[["count", "min_price", "max_price"]].to_numpy(),
+                    hovertemplate=(
+                        "amazon_domain=%{x}<br>avg_price=%{y}<br>count=%{customdata[0]}"
+                        "<br>min_price=%{customdata[1]}<br>max_price=%{customdata[2]}<extra></extra>"
+                    ),
+                ),
+                layout=go.Layout(
+                    title="Country/Domain-wise Price Distribution (avg price by amazon domain)",
+                    xaxis_title="amazon_domain",
+                    yaxis_title="avg_price",
+                ),
             )
-            st.plotly_chart(fig_domain, use_container_width=True)
-
-            geos = df_priced["geo_location"].fillna("Unknown")
-            unique_geos = geos.unique().tolist()
-            if len(unique_geos) <= 15 and df_priced["amazon_domain"].nunique() > 1:
-                pivot = (
-                    df_priced.assign(geo_location=geos)
-                    .groupby(["geo_location", "amazon_domain"])["price"]
-                    .mean()
-                    .reset_index()
-                    .pivot(index="geo_location", columns="amazon_domain", values="price")
+            st.plotly_chart(fig_domain, width="stretch")
+
+            # geo_location is already "Unknown"-filled by _records_to_df.
+            if df_priced["geo_location"].nunique() <= 15 and df_priced["amazon_domain"].nunique() > 1:
+                pivot = pd.crosstab(
+                    index=df_priced["geo_location"],
+                    columns=df_priced["amazon_domain"],
+                    values=df_priced["price"],
+                    aggfunc="mean",
                 )
-                fig_heat = px.imshow(
-                    pivot,
-                    aspect="auto",
-                    title="Heatmap: Avg Price by Geo Location × Domain",
-                    color_continuous_scale="Blues",
+                fig_heat = go.Figure(
+                    go.Heatmap(
+                        z=pivot.to_numpy(),
+                        x=pivot.columns.to_numpy(),
+                        y=pivot.index.to_numpy(),
+                        colorscale="Blues",
+                    ),
+                    layout=go.Layout(
+                        title="Heatmap: Avg Price by Geo Location × Domain",
+                        xaxis_title="amazon_domain",
+                        yaxis_title="geo_location",
+                        # First pivot row on top, as an image would show it.
+                        yaxis_autorange="reversed",
+                    ),
                 )
-                st.plotly_chart(fig_heat, use_container_width=True)
+                st.plotly_chart(fig_heat, width="stretch")
             else:
                 st.caption("Heatmap hidden (too many geos or only one domain).")
 
     # ------------------ Overview & Alerts Tab ------------------
     with tab_overview:
-        if df_latest.empty:
-            st.info("No competitor data available.")
-            return
-
-        # Deal threshold slider
-        threshold_pct = st.slider(
-            "Deal alert threshold (% cheaper than target)",
-            min_value=1,
-            max_value=50,
-            value=10,
-            step=1,
-            key=f"deal_threshold_{selected_asin}"
-        )
-
-        df_bucket = df_latest.copy()
-        df_bucket["has_price"] = df_bucket["price"].notna()
-        if parent_price is None:
-            df_bucket["bucket"] = df_bucket["has_price"].map(lambda x: "Has price" if x else "Missing price")
-        else:
-            def _bucket(p):
-                if p is None or pd.isna(p):
-                    return "Missing price"
-                if p < parent_price * (1 - threshold_pct / 100.0):
-                    return f"Deal (≥{threshold_pct}% cheaper)"
-                if p < parent_price:
-                    return "Cheaper"
-                if abs(p - parent_price) / parent_price <= 0.05:
-                    return "Within ±5%"
-                return "More expensive"
-            df_bucket["bucket"] = df_bucket["price"].apply(_bucket)
-
-        pie = df_bucket.groupby("bucket", as_index=False).size()
-        fig_pie = px.pie(pie, values="size", names="bucket", title="Top Competitors Overview (price buckets)")
-        st.plotly_chart(fig_pie, use_container_width=True)
-
-        brand_counts = (
-            df_latest.groupby("brand", as_index=False)
-            .size()
-            .sort_values("size", ascending=False)
-            .head(10)
-        )
-        fig_brand = px.bar(brand_counts, x="brand", y="size", title="Top Brands in Competitor Set (listing count)")
-        st.plotly_chart(fig_brand, use_container_width=True)
-
-        if parent_price is not None and not df_priced.empty:
-            deals = df_priced[df_priced["price"] < parent_price * (1 - threshold_pct / 100.0)].copy()
-            deals["delta"] = deals["price"] - parent_price
-            deals["delta_pct"] = (deals["price"] / parent_price - 1.0) * 100.0
-            deals = deals.sort_values("delta")
-
-            st.subheader("Deal Detection / Alerts")
-            if deals.empty:
-                st.info("No competitors meet the current deal threshold.")
-            else:
-                st.success(f"Found {len(deals)} deal(s) at ≥{threshold_pct}% cheaper than the target.")
-                st.dataframe(
-                    deals[["title", "asin", "brand", "price", "currency", "delta", "delta_pct", "amazon_domain", "geo_location"]],
-                    use_container_width=True,
-                )
\ No newline at end of file
+        _render_overview(df_latest, parent_price, selected_asin)
@@ -1,62 +1,61 @@
+import pandas as pd
 import streamlit as st
-from state import set_selected_asin
+from state import get_selected_asin, set_selected_asin
 
 
-def render_product_card(product: dict, idx: int):
-    """Render a single product card with proper rounded borders, image, info, and analyze button."""
-    
-    # Create a container with custom styling for the card border
-    with st.container():
-        st.markdown(
-            """
-            <style>
-            div[data-testid="stVerticalBlock"] > div:has(div.product-card-content) {
-                border: 1px solid #e6e6e6;
-                border-radius: 10px;
-                padding: 15px;
-                margin-bottom: 15px;
-            }
-            </style>
-            """,
-            unsafe_allow_html=True,
-        )
-        
-        # Add a marker class for styling
-        st.markdown('<div class="product-card-content"></div>', unsafe_allow_html=True)
-        
-        # Create columns for image and info
-        cols = st.columns([1, 2])
+def _products_to_df(products: list[dict]) -> pd.DataFrame:
+    rows = []
+    for product in products:
+        images = product.get("images") or []
+        currency = product.get("currency", "")
+        price = product.get("price", "-")
+        rows.append({
+            "image": images[0] if images else None,
+            "title": product.get("title") or product["asin"],
+            "asin": product["asin"],
+            "price": f"{currency} {price}" if currency else price,
+            "brand": product.get("brand", "-"),
+            "category": product.get("product", "-"),
+            "domain": f"amazon.{product.get('amazon_domain', 'com')}",
+            "geo_location": product.get("geo_location", "-"),
+            "url": product.get("url"),
+        })
+    return pd.DataFrame(rows)
 
-        # --- Left column: image ---
-        with cols[0]:
-            try:
-                images = product.get("images", [])
-                if images and len(images) > 0:
-                    st.image(images[0], width=200)
-                else:
-                    st.write("No image available.")
-            except Exception:
-                st.write("Error loading image")
 
-        # --- Right column: product info ---
-        with cols[1]:
-            st.subheader(product.get("title") or product["asin"])
-            info_cols = st.columns(3)
-            currency = product.get("currency", "")
-            price = product.get("price", "-")
-            info_cols[0].metric("Price", f"{currency} {price}" if currency else price)
-            info_cols[1].write(f"**Brand:** {product.get('brand', '-')}")
-            info_cols[2].write(f"**Category:** {product.get('product', '-')}")
+def render_product_table(products: list[dict], key: str):
+    """Render one page of products as a single table; selecting a row starts competitor analysis."""
+    if not products:
+        return
 
-            domain_info = f"amazon.{product.get('amazon_domain', 'com')}"
-            geo_info = product.get("geo_location", "-")
-            st.caption(f"Domain: {domain_info} | Geo Location: {geo_info}")
+    df = _products_to_df(products)
+    event = st.dataframe(
+        df,
+        column_config={
+            "image": st.column_config.ImageColumn("Image"),
+            "title": st.column_config.TextColumn("Title"),
+            "asin": st.column_config.TextColumn("ASIN"),
+            "price": st.column_config.TextColumn("Price"),
+            "brand": st.column_config.TextColumn("Brand"),
+            "category": st.column_config.TextColumn("Category"),
+            "domain": st.column_config.TextColumn("Domain"),
+            "geo_location": st.column_config.TextColumn("Geo Location"),
+            "url": st.column_config.LinkColumn("URL"),
+        },
+        hide_index=True,
+        width="stretch",
+        on_select="rerun",
+        selection_mode="single-row",
+        key=key,
+    )
 
-            st.write(product.get("url", "-"))
-
-            # --- Analyze button (unique key per product) ---
-            if st.button(
-                "Start analyzing competitors",
-                key=f"analyze_{product['asin']}_{idx}"
-            ):
-                set_selected_asin(product["asin"])
+    rows = event.selection.rows
+    if rows:
+        asin = df["asin"].iloc[rows[0]]
+        # The selection stays set across reruns; only react when it names a new product.
+        if asin != get_selected_asin():
+            set_selected_asin(asin)
+            # The list renders inside a fragment; rerun the whole app so the
+            # competitor section picks up the new selection.
+            st.rerun()
+    st.caption("Select a row to analyze its competitors.")